@@ -35,15 +35,15 @@ def create_w_files():
         with xr.open_dataset(u_path) as u_ds:
             print(f"📁 Creating {w_file} based on {u_file}")
             
-            # Create W dataset with same structure but zero values
-            w_ds = u_ds.copy(deep=True)
+            # Replace U variable with W (vertical velocity = 0); only the
+            # shape and dtype of U are needed, so its data is never read.
+            # A broadcast view of a single zero avoids allocating the full cube.
+            u_var = u_ds['vozocrtx']
+            w_data = np.broadcast_to(np.zeros((), dtype=u_var.dtype), u_var.shape)
             
-            # Replace U variable with W (vertical velocity = 0)
-            w_data = np.zeros_like(u_ds['vozocrtx'].values)
-            
-            # Create new dataset with W variable
-            w_ds = w_ds.drop_vars(['vozocrtx'])  # Remove U variable
-            w_ds['vovecrtz'] = (u_ds['vozocrtx'].dims, w_data)  # Add W variable
+            # Create new dataset with W variable (shallow: no copy of the U data)
+            w_ds = u_ds.drop_vars(['vozocrtx'])  # Remove U variable
+            w_ds['vovecrtz'] = (u_var.dims, w_data)  # Add W variable
             
             # Update attributes
             w_ds['vovecrtz'].attrs = {
@@ -60,8 +60,9 @@ def create_w_files():
             w_ds.attrs['title'] = 'Vertical velocity (W) - Zero for surface data'
             w_ds.attrs['comment'] = 'Created from Copernicus surface data - W=0 everywhere'
             
-            # Save W file
-            w_ds.to_netcdf(w_path)
+            # Save W file; the field is constant, so deflate shrinks it to
+            # almost nothing at negligible CPU cost
+            w_ds.to_netcdf(w_path, encoding={'vovecrtz': {'zlib': True, 'complevel': 1}})
             print(f"✅ Created {w_file}")
 
 if __name__ == "__main__":
@@ -9,96 +9,139 @@ import os
 from datetime import datetime
 import pandas as pd
 
-def convert_subset_to_schism(input_file, output_dir):
+def is_complete_day_file(path, n_times):
+    """Return True when path is a readable output file holding all n_times time steps of its day."""
+    if not os.path.exists(path):
+        return False
+    try:
+        # Only the header is read; the data itself is never loaded
+        with xr.open_dataset(path, decode_times=False) as existing:
+            return existing.sizes.get('time_counter') == n_times
+    except (OSError, ValueError):
+        return False
+
+def convert_subset_to_schism(input_file, output_dir, overwrite=False):
     """
     Convert subset.nc to SCHISM format with separate files per variable and day
+
+    A day is skipped (unless overwrite is True) when its output files (U/V/T/S, for the variables
+    present) already exist in output_dir and hold as many time steps as the input has for that day;
+    otherwise the day is rewritten. Files are moved into place only once a whole day is written,
+    so an interrupted or extended conversion can simply be re-run.
     """
     print(f"Loading {input_file}...")
-    ds = xr.open_dataset(input_file)
+    # Open lazily, one time step per chunk, so only the day being written is read into memory
+    with xr.open_dataset(input_file, chunks={'time': 1}) as ds:
+    
+        # Create output directory
+        os.makedirs(output_dir, exist_ok=True)
     
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
+        # Variable mapping: Copernicus -> SCHISM
+        var_mapping = {
+            'uo': 'vozocrtx',      # Eastward velocity
+            'vo': 'vomecrty',      # Northward velocity  
+            'thetao': 'votemper',  # Temperature
+            'so': 'vosaline'       # Salinity
+        }
+        # Output file prefix for each variable (U_<date>.nc, V_<date>.nc, ...)
+        file_prefixes = {'uo': 'U', 'vo': 'V', 'thetao': 'T', 'so': 'S'}
+    
+        # Create coordinate mapping
+        print("Converting coordinates...")
     
-    # Variable mapping: Copernicus -> SCHISM
-    var_mapping = {
-        'uo': 'vozocrtx',      # Eastward velocity
-        'vo': 'vomecrty',      # Northward velocity  
-        'thetao': 'votemper',  # Temperature
-        'so': 'vosaline'       # Salinity
-    }
+        # Convert longitude/latitude to nav_lon/nav_lat (2D broadcast views, no meshgrid copies)
+        lons_2d, lats_2d = np.broadcast_arrays(ds.longitude.values[np.newaxis, :],
+                                               ds.latitude.values[:, np.newaxis])
+        y_coord = ('y', np.arange(len(ds.latitude)))
+        x_coord = ('x', np.arange(len(ds.longitude)))
+        nav_lon = xr.DataArray(lons_2d, dims=['y', 'x'], coords={'y': y_coord, 'x': x_coord})
+        nav_lat = xr.DataArray(lats_2d, dims=['y', 'x'], coords={'y': y_coord, 'x': x_coord})
     
-    # Create coordinate mapping
-    print("Converting coordinates...")
+        # Select the surface layer (depth=0) of all converted variables in one go, as float32
+        surface = ds[[v for v in var_mapping if v in ds.data_vars]].isel(depth=0).astype(np.float32)
+        # Prefixes of the files a day produces; a variable missing from the input has no file to wait for
+        output_prefixes = [file_prefixes[v] for v in surface.data_vars]
     
-    # Convert longitude/latitude to nav_lon/nav_lat (2D arrays)
-    lons_2d, lats_2d = np.meshgrid(ds.longitude.values, ds.latitude.values)
+        # One compressed chunk per time step: parcels reads the fields a snapshot at a time
+        encoding = {
+            'chunksizes': (1, len(ds.latitude), len(ds.longitude)),
+            'zlib': True,
+            'complevel': 4,
+            'shuffle': True
+        }
     
-    # Group by day
-    daily_groups = ds.groupby(ds.time.dt.date)
+        # Group by day
+        daily_groups = surface.groupby(surface.time.dt.date)
     
-    print(f"Processing {len(daily_groups)} days...")
+        print(f"Processing {len(daily_groups)} days...")
+        files_created = 0
     
-    for date, daily_data in daily_groups:
-        date_str = date.strftime('%Y-%m-%d')
-        print(f"  Processing {date_str}...")
+        for date, daily_data in daily_groups:
+            date_str = date.strftime('%Y-%m-%d')
+            if not overwrite and all(is_complete_day_file(os.path.join(output_dir, f'{prefix}_{date_str}.nc'),
+                                                          daily_data.sizes['time'])
+                                     for prefix in output_prefixes):
+                print(f"  Skipping {date_str} (output files already complete)")
+                continue
+            print(f"  Processing {date_str}...")
         
-        # Process each variable
-        for copernicus_var, schism_var in var_mapping.items():
-            if copernicus_var in daily_data.data_vars:
-                print(f"    Converting {copernicus_var} -> {schism_var}")
-                
-                # Extract surface data (depth=0)
-                var_data = daily_data[copernicus_var].isel(depth=0)
-                
-                # Create new dataset in SCHISM format
-                ds_out = xr.Dataset()
+            # Collect the day's per-variable datasets and write them in one batch
+            daily_datasets = []
+            daily_paths = []
+        
+            # Process each variable
+            for copernicus_var, schism_var in var_mapping.items():
+                if copernicus_var in daily_data.data_vars:
+                    print(f"    Converting {copernicus_var} -> {schism_var}")
                 
-                # Add the variable with SCHISM name
-                ds_out[schism_var] = xr.DataArray(
-                    var_data.values,
-                    dims=['time_counter', 'y', 'x'],
-                    coords={
-                        'time_counter': ('time_counter', var_data.time.values),
-                        'y': ('y', np.arange(len(ds.latitude))),
-                        'x': ('x', np.arange(len(ds.longitude)))
-                    }
-                )
+                    var_data = daily_data[copernicus_var]
                 
-                # Add navigation coordinates
-                ds_out['nav_lon'] = xr.DataArray(
-                    lons_2d,
-                    dims=['y', 'x'],
-                    coords={'y': ds_out.y, 'x': ds_out.x}
-                )
+                    # Create new dataset in SCHISM format
+                    ds_out = xr.Dataset()
                 
-                ds_out['nav_lat'] = xr.DataArray(
-                    lats_2d,
-                    dims=['y', 'x'], 
-                    coords={'y': ds_out.y, 'x': ds_out.x}
-                )
+                    # Add the variable with SCHISM name
+                    ds_out[schism_var] = xr.DataArray(
+                        var_data.data,  # still lazy; computed while writing
+                        dims=['time_counter', 'y', 'x'],
+                        coords={
+                            'time_counter': ('time_counter', var_data.time.values),
+                            'y': y_coord,
+                            'x': x_coord
+                        }
+                    )
+                    ds_out[schism_var].encoding = dict(encoding)
                 
-                # Add attributes
-                ds_out.attrs = {
-                    'Conventions': 'CF-1.0',
-                    'source': f'Copernicus Marine {date_str} converted to NEMO format',
-                    'institution': 'PlasticParcels Converter',
-                    'history': f'Created on {datetime.now().isoformat()}'
-                }
+                    # Add navigation coordinates
+                    ds_out['nav_lon'] = nav_lon
+                    ds_out['nav_lat'] = nav_lat
                 
-                # Determine variable prefix
-                if copernicus_var == 'uo':
-                    prefix = 'U'
-                elif copernicus_var == 'vo':
-                    prefix = 'V'
-                elif copernicus_var == 'thetao':
-                    prefix = 'T'
-                elif copernicus_var == 'so':
-                    prefix = 'S'
+                    # Add attributes
+                    ds_out.attrs = {
+                        'Conventions': 'CF-1.0',
+                        'source': f'Copernicus Marine {date_str} converted to NEMO format',
+                        'institution': 'PlasticParcels Converter',
+                        'history': f'Created on {datetime.now().isoformat()}'
+                    }
                 
-                # Save file
-                output_file = os.path.join(output_dir, f'{prefix}_{date_str}.nc')
-                ds_out.to_netcdf(output_file)
-                print(f"      Saved: {output_file}")
+                    daily_datasets.append(ds_out)
+                    daily_paths.append(os.path.join(output_dir, f'{file_prefixes[copernicus_var]}_{date_str}.nc'))
+        
+            # Save all variable files for this day. save_mfdataset creates every file before
+            # computing any data, so write under temporary names and only move them into place
+            # once the whole day succeeded; a crash never leaves files the skip check would trust.
+            if daily_datasets:
+                tmp_paths = [f'{path}.tmp' for path in daily_paths]
+                try:
+                    xr.save_mfdataset(daily_datasets, tmp_paths)
+                except Exception:
+                    for tmp_path in tmp_paths:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                    raise
+                for tmp_path, output_file in zip(tmp_paths, daily_paths):
+                    os.replace(tmp_path, output_file)
+                    print(f"      Saved: {output_file}")
+                files_created += len(daily_paths)
     
     # Only create settings.json if it doesn't exist (preserve existing configuration)
     settings_file = os.path.join(output_dir, 'settings.json')
@@ -149,7 +192,7 @@ def convert_subset_to_schism(input_file, output_dir):
     print(f"\nConversion complete!")
     print(f"Output directory: {output_dir}")
     print(f"Settings file: {settings_file}")
-    print(f"Files created: {len(daily_groups) * len(var_mapping)} variable files")
+    print(f"Files created: {files_created} variable files")
 
 if __name__ == "__main__":
     input_file = "/mnt/raid5/sbao/plastics/plasticparcels/downloads/subset.nc"
@@ -61,8 +61,8 @@ def get_mask_land(field, lons, lats, outfile='./tmp_mask_land'):
     Mask with true on land cells, false on ocean cells
     """
     if os.path.exists(outfile):
-        ds = xr.open_dataset(outfile)
-        mask_land = np.array(ds['mask_land'], dtype=bool)
+        with xr.open_dataset(outfile) as ds:
+            mask_land = np.array(ds['mask_land'], dtype=bool)
     else:
         mask_land = np.isnan(field)
         to_netcdf(outfile, [mask_land], ['mask_land'], lons, lats, explanation='land mask')
@@ -82,8 +82,7 @@ def get_shore_nodes(landmask):
     mask_lap = np.roll(landmask, -1, axis=0) + np.roll(landmask, 1, axis=0)
     mask_lap += np.roll(landmask, -1, axis=1) + np.roll(landmask, 1, axis=1)
     mask_lap -= 4*landmask
-    shore = np.ma.masked_array(landmask, mask_lap < 0)
-    shore = shore.mask.astype('int')
+    shore = (mask_lap < 0).astype('int')
 
     return shore
 
@@ -104,8 +103,7 @@ def get_shore_nodes_diagonal(landmask):
     mask_lap += np.roll(landmask, (-1, 1), axis=(0, 1)) + np.roll(landmask, (1, 1), axis=(0, 1))
     mask_lap += np.roll(landmask, (-1, -1), axis=(0, 1)) + np.roll(landmask, (1, -1), axis=(0, 1))
     mask_lap -= 8*landmask
-    shore = np.ma.masked_array(landmask, mask_lap < 0)
-    shore = shore.mask.astype('int')
+    shore = (mask_lap < 0).astype('int')
 
     return shore
 
@@ -120,9 +118,9 @@ def create_displacement_field(landmask, lons, lats, double_cell=False, outfile='
     Output: two 2D arrays, one for each camponent of the velocity.
     """
     if os.path.exists(outfile):
-        ds = xr.open_dataset(outfile)
-        v_x = np.array(ds['land_current_u'], dtype=float)
-        v_y = np.array(ds['land_current_v'], dtype=float)
+        with xr.open_dataset(outfile) as ds:
+            v_x = np.array(ds['land_current_u'], dtype=float)
+            v_y = np.array(ds['land_current_v'], dtype=float)
 
     else:
         shore = get_shore_nodes(landmask)
@@ -152,8 +150,7 @@ def create_displacement_field(landmask, lons, lats, double_cell=False, outfile='
         magnitude = np.sqrt(v_y**2 + v_x**2)
         # the coastal nodes between land create a problem. Magnitude there is zero
         # I force it to be 1 to avoid problems when normalizing.
-        ny, nx = np.where(magnitude == 0)
-        magnitude[ny, nx] = 1
+        magnitude[magnitude == 0] = 1
 
         v_x = v_x/magnitude
         v_y = v_y/magnitude
@@ -167,8 +164,8 @@ def get_mask_coast(mask_land, lons, lats, outfile='./tmp_mask_coast'):
     calculate the coast mask. With coastal cells, we mean cells in the water, adjacent to land
     """
     if os.path.exists(outfile):
-        ds = xr.open_dataset(outfile)
-        mask_coast = np.array(ds['mask_coast'], dtype=bool)
+        with xr.open_dataset(outfile) as ds:
+            mask_coast = np.array(ds['mask_coast'], dtype=bool)
     else:
         # check the upper,lower,left & right neighbor: if one of these is an ocean cell, set to landborder
         mask_coast = ~mask_land & (np.roll(mask_land, 1, axis=0) | np.roll(mask_land, -1, axis=0)
@@ -11,13 +11,47 @@ import urllib.request as urlr
 import cartopy.io.shapereader as shpreader
 import geopandas as gpd
 import glob
-from scipy import spatial
+from concurrent.futures import ThreadPoolExecutor
+from scipy.spatial import cKDTree
 from scipy.interpolate import RegularGridInterpolator
 
-from utils import distance, get_coords_from_polygon
+from utils import distance, get_coords_from_polygon, lonlat_to_xyz
 
 
 # Function definitions
+def get_country_points():
+    """
+    Return a dataframe with every vertex of the Natural Earth country polygons, and the
+    continent, region, subregion, and country it belongs to. Used to attach country
+    information to release points by nearest neighbour.
+    """
+    shpfilename = shpreader.natural_earth(resolution='50m',
+                                          category='cultural',
+                                          name='admin_0_countries')
+    reader = shpreader.Reader(shpfilename)
+    countries = reader.records()
+
+    countries_list = []
+    for country in countries:
+        continent = country.attributes['CONTINENT']
+        region_un = country.attributes['REGION_UN']
+        subregion = country.attributes['SUBREGION']
+        country_name = country.attributes['NAME_LONG']
+
+        country_coords = get_coords_from_polygon(country.geometry)
+        country_lons, country_lats = country_coords[:, 0], country_coords[:, 1]
+
+        # Scalar columns are broadcast by pandas to the length of the coordinate columns
+        country_df = pd.DataFrame({'Continent': continent,
+                                   'Region': region_un,
+                                   'Subregion': subregion,
+                                   'Country': country_name,
+                                   'Longitude': country_lons,
+                                   'Latitude': country_lats})
+        countries_list.append(country_df)
+    return pd.concat(countries_list)
+
+
 def create_coastal_mpw_jambeck_release_map(mask_coast_filepath, coords_filepath, gpw_filepath,
                                            distance_threshhold=50., grid_range=0.083,
                                            gpw_column_name='Population Density, v4.11 (2000, 2005, 2010, 2015, 2020): 2.5 arc-minutes',
@@ -81,12 +115,17 @@ def create_coastal_mpw_jambeck_release_map(mask_coast_filepath, coords_filepath,
     data_mask_coast = xr.open_dataset(mask_coast_filepath)
     coords = xr.open_dataset(coords_filepath, decode_cf=False)
 
-    lats_coast = data_mask_coast['lat'].data[np.where(data_mask_coast['mask_coast'])]
-    lons_coast = data_mask_coast['lon'].data[np.where(data_mask_coast['mask_coast'])]
+    coast_ids = np.where(data_mask_coast['mask_coast'])
+    lats_coast = data_mask_coast['lat'].data[coast_ids]
+    lons_coast = data_mask_coast['lon'].data[coast_ids]
 
     # Compute the area of each grid cell
     cell_areas = coords['e1t'][0] * coords['e2t'][0]/10e6  # in km**2
-    coastal_cell_areas = cell_areas.data[np.where(data_mask_coast['mask_coast'])]
+    coastal_cell_areas = cell_areas.data[coast_ids]
+
+    # Search tree over the coastal cells, and distance_threshhold as a chord length on the unit sphere
+    coastal_tree = cKDTree(lonlat_to_xyz(lons_coast, lats_coast))
+    chord_threshhold = 2*np.sin(distance_threshhold/(2*6371))
 
     # Loop through all countries from Natural Earth dataset
     coastal_density_list = []
@@ -101,15 +140,11 @@ def create_coastal_mpw_jambeck_release_map(mask_coast_filepath, coords_filepath,
         country_coords = get_coords_from_polygon(country.geometry)
         country_lons, country_lats = country_coords[:, 0], country_coords[:, 1]
 
-        # Loop through country points to find coastal points within distance_threshhold km
-        all_coastal_indices = []
-        for i in range(len(country_lons)):
-            distances = distance(np.repeat(country_lons[i], len(lons_coast)), np.repeat(country_lats[i], len(lats_coast)), lons_coast, lats_coast)
-            coastal_indices = np.where(distances <= distance_threshhold)[0]  # Coastal indices are those that are within the thresshold distance
-            all_coastal_indices.append(coastal_indices)
+        # Find coastal points within distance_threshhold km of any of the country points
+        all_coastal_indices = coastal_tree.query_ball_point(lonlat_to_xyz(country_lons, country_lats), r=chord_threshhold)
 
         # Concatenate into one list and identify the unique coastal cells
-        all_coastal_indices = np.unique(np.hstack(all_coastal_indices))
+        all_coastal_indices = np.unique(np.hstack(all_coastal_indices)).astype(int)
 
         # For all coastal points assigned to the country, find the maximum population density around that point
         country_coastal_density_list = []
@@ -234,58 +269,24 @@ def create_rivers_meijer_release_map(mask_coast_filepath, river_filepath):
 
     # Load in coast mask
     data_mask_coast = xr.open_dataset(mask_coast_filepath)
-    lats_coast = data_mask_coast['lat'].data[np.where(data_mask_coast['mask_coast'])]
-    lons_coast = data_mask_coast['lon'].data[np.where(data_mask_coast['mask_coast'])]
+    coast_ids = np.where(data_mask_coast['mask_coast'])
+    lats_coast = data_mask_coast['lat'].data[coast_ids]
+    lons_coast = data_mask_coast['lon'].data[coast_ids]
 
     # Load Natural Earth dataset for attaching country information to river source
-    shpfilename = shpreader.natural_earth(resolution='50m',
-                                          category='cultural',
-                                          name='admin_0_countries')
-    reader = shpreader.Reader(shpfilename)
-    countries = reader.records()
+    coastal_df = get_country_points()
 
-    countries_list = []
-    for country in countries:
-        continent = country.attributes['CONTINENT']
-        region_un = country.attributes['REGION_UN']
-        subregion = country.attributes['SUBREGION']
-        country_name = country.attributes['NAME_LONG']
-
-        country_coords = get_coords_from_polygon(country.geometry)
-        country_lons, country_lats = country_coords[:, 0], country_coords[:, 1]
-
-        country_df = pd.DataFrame({'Continent': np.repeat(continent, len(country_lons)),
-                                   'Region': np.repeat(region_un, len(country_lons)),
-                                   'Subregion': np.repeat(subregion, len(country_lons)),
-                                   'Country': np.repeat(country_name, len(country_lons)),
-                                   'Longitude': country_lons,
-                                   'Latitude': country_lats})
-        countries_list.append(country_df)
-    coastal_df = pd.concat(countries_list)
+    # Build the search trees once and find, for every river point, the closest coastal cell
+    # and the closest country point (to assign country information)
+    river_points = lonlat_to_xyz(lon_river, lat_river)
+    _, closest_coast_ids = cKDTree(lonlat_to_xyz(lons_coast, lats_coast)).query(river_points)
+    _, closest_country_ids = cKDTree(lonlat_to_xyz(coastal_df['Longitude'], coastal_df['Latitude'])).query(river_points)
 
     # Create river emissions dataset
-    river_emissions_list = []
-
-    for i, (lon, lat, output) in enumerate(zip(lon_river, lat_river, output_river)):
-        # Find closest coastal cell
-        distances = distance(np.repeat(lon, len(lons_coast)), np.repeat(lat, len(lats_coast)), lons_coast, lats_coast)
-        closest_coast_id = np.argmin(distances)
-
-        # Find closest country point to river point to assign country information
-        distances_country = distance(np.repeat(lon, len(coastal_df['Longitude'])),
-                                     np.repeat(lat, len(coastal_df['Latitude'])),
-                                     coastal_df['Longitude'],
-                                     coastal_df['Latitude'])
-        closest_country_id = np.argmin(distances_country)
-
-        river_emissions_list.append({'Continent': coastal_df['Continent'].iloc[closest_country_id],
-                                     'Region': coastal_df['Region'].iloc[closest_country_id],
-                                     'Subregion': coastal_df['Subregion'].iloc[closest_country_id],
-                                     'Country': coastal_df['Country'].iloc[closest_country_id],
-                                     'Longitude': lons_coast[closest_coast_id],
-                                     'Latitude': lats_coast[closest_coast_id],
-                                     'Emissions': output})
-    river_emissions_df = pd.DataFrame.from_records(river_emissions_list)
+    river_emissions_df = coastal_df.iloc[closest_country_ids][['Continent', 'Region', 'Subregion', 'Country']].reset_index(drop=True)
+    river_emissions_df['Longitude'] = lons_coast[closest_coast_ids]
+    river_emissions_df['Latitude'] = lats_coast[closest_coast_ids]
+    river_emissions_df['Emissions'] = output_river
 
     return river_emissions_df
 
@@ -316,11 +317,13 @@ def create_fisheries_gfwv2_release_map(fisheries_filepath, mask_land_filepath):
     fisheries_files = sorted(glob.glob(fisheries_filepath + 'fleet*/*'))
 
     # Load Global Fishing Watch data and concatenate into one
-    data_fisheries = []
-    for file_ in fisheries_files:
+    def read_fisheries_day(file_):
         data_fisheries_day = pd.read_csv(file_)
-        data_fisheries_day = data_fisheries_day[data_fisheries_day['fishing_hours'] > 0]
-        data_fisheries.append(data_fisheries_day)
+        return data_fisheries_day[data_fisheries_day['fishing_hours'] > 0]
+
+    # The daily files are independent, so read them concurrently (pandas releases the GIL while parsing)
+    with ThreadPoolExecutor() as executor:
+        data_fisheries = list(executor.map(read_fisheries_day, fisheries_files))
 
     data_fisheries = pd.concat(data_fisheries, axis=0, ignore_index=True)
 
@@ -370,15 +373,16 @@ def create_fisheries_gfwv2_release_map(fisheries_filepath, mask_land_filepath):
     model_agg_data_fisheries_info = agg_data_fisheries_info.copy(deep=True)
     data_mask_land = xr.open_dataset(mask_land_filepath)
 
-    lats_ocean = data_mask_land['lat'].data[np.where(~data_mask_land['mask_land'])]
-    lons_ocean = data_mask_land['lon'].data[np.where(~data_mask_land['mask_land'])]
+    ocean_ids = np.where(~data_mask_land['mask_land'])
+    lats_ocean = data_mask_land['lat'].data[ocean_ids]
+    lons_ocean = data_mask_land['lon'].data[ocean_ids]
 
     # A list of ocean points
     ocean_points = np.array([lons_ocean, lats_ocean]).T
 
     # Find closest ocean cell to the fisheries data
     fishing_points = np.array(model_agg_data_fisheries_info[['Longitude', 'Latitude']])
-    distances_deg, indices = spatial.KDTree(ocean_points).query(fishing_points)
+    distances_deg, indices = cKDTree(ocean_points).query(fishing_points)
 
     mapped_ocean_points = ocean_points[indices]
 
@@ -412,8 +416,9 @@ def create_global_concentrations_kaandorp_release_map(mask_land_filepath, mask_c
     # Load in coast mask and model coordinates
     data_mask_coast = xr.open_dataset(mask_coast_filepath)
 
-    lats_coast = data_mask_coast['lat'].data[np.where(data_mask_coast['mask_coast'])]
-    lons_coast = data_mask_coast['lon'].data[np.where(data_mask_coast['mask_coast'])]
+    coast_ids = np.where(data_mask_coast['mask_coast'])
+    lats_coast = data_mask_coast['lat'].data[coast_ids]
+    lons_coast = data_mask_coast['lon'].data[coast_ids]
 
     # Tackle the beach concentrations first:
     # Create a list of lons, lats, concentration values
@@ -422,66 +427,34 @@ def create_global_concentrations_kaandorp_release_map(mask_land_filepath, mask_c
     conc_beach = np.power(10, beach.values)  # beach.values are in log10 form
 
     # Load Natural Earth dataset for attaching country information to beach source
-    shpfilename = shpreader.natural_earth(resolution='50m',
-                                          category='cultural',
-                                          name='admin_0_countries')
-    reader = shpreader.Reader(shpfilename)
-    countries = reader.records()
+    coastal_df = get_country_points()
 
-    countries_list = []
-    for country in countries:
-        continent = country.attributes['CONTINENT']
-        region_un = country.attributes['REGION_UN']
-        subregion = country.attributes['SUBREGION']
-        country_name = country.attributes['NAME_LONG']
+    distance_threshhold = 50.
 
-        country_coords = get_coords_from_polygon(country.geometry)
-        country_lons, country_lats = country_coords[:, 0], country_coords[:, 1]
+    # Find the closest beach concentration to every coastal cell with a single tree query
+    _, closest_beach_ids = cKDTree(lonlat_to_xyz(lon_beach, lat_beach)).query(lonlat_to_xyz(lons_coast, lats_coast))
+    beach_distances = distance(lons_coast, lats_coast, lon_beach[closest_beach_ids], lat_beach[closest_beach_ids])
 
-        country_df = pd.DataFrame({'Continent': np.repeat(continent, len(country_lons)),
-                                   'Region': np.repeat(region_un, len(country_lons)),
-                                   'Subregion': np.repeat(subregion, len(country_lons)),
-                                   'Country': np.repeat(country_name, len(country_lons)),
-                                   'Longitude': country_lons,
-                                   'Latitude': country_lats})
-        countries_list.append(country_df)
-    coastal_df = pd.concat(countries_list)
+    # Only keep coastal grid cells within a threshhold from a littered beach
+    near_beach_ids = np.where(beach_distances <= distance_threshhold)[0]
 
-    # Create coastal concentrations dataset
-    coast_concentration_list = []
-    distance_threshhold = 50.
+    # Find the closest country point to each of those coastal cells to assign country information
+    _, closest_country_ids = cKDTree(lonlat_to_xyz(coastal_df['Longitude'], coastal_df['Latitude'])).query(lonlat_to_xyz(lons_coast[near_beach_ids], lats_coast[near_beach_ids]))
 
-    for i, (lon, lat) in enumerate(zip(lons_coast, lats_coast)):
-        # Find the closest beach concentration
-        distances = distance(np.repeat(lon, len(lon_beach)), np.repeat(lat, len(lat_beach)), lon_beach, lat_beach)
-        closest_beach_id = np.argmin(distances)
-        if distances[closest_beach_id] > distance_threshhold:  # skip coastal grid cells not within a threshhold from a littered beach
-            continue
-        else:
-            # Find the closest country point to the coastal cell to assign country information
-            distances_country = distance(np.repeat(lon, len(coastal_df['Longitude'])),
-                                         np.repeat(lat, len(coastal_df['Latitude'])),
-                                         coastal_df['Longitude'],
-                                         coastal_df['Latitude'])
-            closest_country_id = np.argmin(distances_country)
-
-            coast_concentration_list.append({'Continent': coastal_df['Continent'].iloc[closest_country_id],
-                                             'Region': coastal_df['Region'].iloc[closest_country_id],
-                                             'Subregion': coastal_df['Subregion'].iloc[closest_country_id],
-                                             'Country': coastal_df['Country'].iloc[closest_country_id],
-                                             'Longitude': lon,
-                                             'Latitude': lat,
-                                             'Concentration': conc_beach[closest_beach_id],
-                                             'ConcentrationType': 'Beach'})
-
-    coast_concentration_df = pd.DataFrame.from_records(coast_concentration_list)
+    # Create coastal concentrations dataset
+    coast_concentration_df = coastal_df.iloc[closest_country_ids][['Continent', 'Region', 'Subregion', 'Country']].reset_index(drop=True)
+    coast_concentration_df['Longitude'] = lons_coast[near_beach_ids]
+    coast_concentration_df['Latitude'] = lats_coast[near_beach_ids]
+    coast_concentration_df['Concentration'] = conc_beach[closest_beach_ids[near_beach_ids]]
+    coast_concentration_df['ConcentrationType'] = 'Beach'
 
     # Now tackle the surface ocean concentrations:
     conc_ocean = np.power(10, ocean.values)  # Values are in log10 space
 
     data_mask_land = xr.open_dataset(mask_land_filepath)
-    lats_ocean = data_mask_land['lat'].data[np.where(~data_mask_land['mask_land'])]
-    lons_ocean = data_mask_land['lon'].data[np.where(~data_mask_land['mask_land'])]
+    ocean_ids = np.where(~data_mask_land['mask_land'])
+    lats_ocean = data_mask_land['lat'].data[ocean_ids]
+    lons_ocean = data_mask_land['lon'].data[ocean_ids]
 
     # Function to interpolate the ocean concentrations
     f_interp_conc_ocean = RegularGridInterpolator((ocean.lon, ocean.lat), conc_ocean.T, method='nearest', bounds_error=False, fill_value=None)
@@ -491,17 +464,14 @@ def create_global_concentrations_kaandorp_release_map(mask_land_filepath, mask_c
 
     # Create ocean concentration dataset where values are non-NaN
     non_nan_id = ~np.isnan(interp_conc_ocean)
-    ocean_concentration_list = []
-    for i in np.where(non_nan_id)[0]:
-        ocean_concentration_list.append({'Continent': 'N/A',
-                                         'Region': 'N/A',
-                                         'Subregion': 'N/A',
-                                         'Country': 'N/A',
-                                         'Longitude': lons_ocean[i],
-                                         'Latitude': lats_ocean[i],
-                                         'Concentration': interp_conc_ocean[i],
-                                         'ConcentrationType': 'Ocean'})
-    ocean_concentration_df = pd.DataFrame.from_records(ocean_concentration_list)
+    ocean_concentration_df = pd.DataFrame({'Continent': 'N/A',
+                                           'Region': 'N/A',
+                                           'Subregion': 'N/A',
+                                           'Country': 'N/A',
+                                           'Longitude': lons_ocean[non_nan_id],
+                                           'Latitude': lats_ocean[non_nan_id],
+                                           'Concentration': interp_conc_ocean[non_nan_id],
+                                           'ConcentrationType': 'Ocean'})
 
     # Combine the two beach and ocean datasets
     concentration_df = pd.concat([ocean_concentration_df, coast_concentration_df])
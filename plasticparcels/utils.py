@@ -3,7 +3,6 @@ from glob import glob
 import pandas as pd
 from datetime import timedelta
 import os
-import shapely as sh
 import json
 from pathlib import Path
 from urllib.request import urlretrieve
@@ -35,15 +34,11 @@ def select_files(dirread, string_, date_current, dt_sim, i_date_s=-13, i_date_e=
 
     possible_files = sorted(possible_files)
 
-    indices_use = []
-    for i1, file_ in enumerate(possible_files):
-        str_date = os.path.basename(file_)[i_date_s:i_date_e]
-        date_ = pd.Timestamp(str_date)
+    # Parse the dates of all files at once and keep those within the time window
+    dates = pd.to_datetime([os.path.basename(file_)[i_date_s:i_date_e] for file_ in possible_files])
+    use = (dates > time_start) & (dates < time_end)
 
-        if date_ > time_start and date_ < time_end:
-            indices_use.append(i1)
-
-    files_use = list(possible_files[i] for i in indices_use)
+    files_use = [file_ for file_, use_ in zip(possible_files, use) if use_]
     return files_use
 
 
@@ -79,12 +74,28 @@ def distance(lon1, lat1, lon2, lat2):
     return c*r
 
 
+def lonlat_to_xyz(lon, lat):
+    """Function to convert longitudes and latitudes (in decimal degrees) to
+    points on the unit sphere. The straight-line distance between two such
+    points increases monotonically with their great circle distance, so a
+    KD-tree built on them finds the same nearest neighbours as `distance`.
+    """
+    lonr = np.radians(lon)
+    latr = np.radians(lat)
+
+    return np.column_stack([np.cos(latr)*np.cos(lonr),
+                            np.cos(latr)*np.sin(lonr),
+                            np.sin(latr)])
+
+
 def get_coords_from_polygon(shape):
     """Function to return a list of coordinate points on a Polygon
     (or MultiPolygon) shape.
 
     Based on: https://stackoverflow.com/questions/58844463/how-to-get-a-list-of-every-point-inside-a-multipolygon-using-shapely
     """
+    import shapely as sh  # only needed by the release-map scripts, so not imported with the package
+
     coords = []
 
     if isinstance(shape, sh.geometry.Polygon):
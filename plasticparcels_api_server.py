@@ -8,6 +8,7 @@ trajectories in GeoJSON format using PlasticParcels.
 
 import gc
 import os
+import re
 import sys
 import json
 import tempfile
@@ -37,7 +38,9 @@ SETTINGS = None
 LAND_MASK = None  # 2D boolean array: True = land, False = ocean
 SIM_LOCK = threading.Lock()  # Serialize simulations to prevent HDF5 concurrency issues
 VF_LOCK = threading.Lock()   # Serialize /vector-field to prevent concurrent NC opens
-VECTOR_CACHE = {}            # {date_str: {u, v, lats, lons, times}} — preloaded numpy arrays
+VECTOR_CACHE = {}            # {date_str: {u, v, lats, lons, land, times}} — preloaded numpy arrays
+INFO_CACHE = None            # fieldset-derived part of the /info response, built once
+U_FILE_RE = re.compile(r'U_(\d{4}-\d{2}-\d{2})\.nc')  # daily velocity files, e.g. U_2024-01-01.nc
 
 
 def parse_bool(value, default=False):
@@ -58,6 +61,24 @@ def parse_bool(value, default=False):
     return bool(value)
 
 
+def is_valid_date(date_str):
+    """Return True when date_str is a real calendar date in YYYY-MM-DD format."""
+    try:
+        datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        return False
+    return True
+
+
+def list_available_dates(data_dir):
+    """Return the sorted YYYY-MM-DD dates of the daily U_ velocity files in data_dir.
+
+    Files whose name matches the pattern but not a real date (e.g. U_2024-13-45.nc) are skipped.
+    """
+    matches = (U_FILE_RE.fullmatch(name) for name in os.listdir(data_dir))
+    return sorted(m.group(1) for m in matches if m and is_valid_date(m.group(1)))
+
+
 def has_data_files(subdir, prefix):
     """Return True when a data subdirectory contains matching NetCDF files."""
     if not DATA_DIR:
@@ -82,40 +103,62 @@ def get_simulation_capabilities():
     }
 
 def build_land_mask(data_dir):
-    """Build a 2D land mask for the data grid using Natural Earth coastline."""
-    try:
-        from shapely.geometry import Point
-        from shapely.prepared import prep
-        import cartopy.io.shapereader as shpreader
-        from shapely.ops import unary_union
-
-        # Load Natural Earth 50m coastline
-        land_shp = shpreader.natural_earth(resolution='50m', category='physical', name='land')
-        reader = shpreader.Reader(land_shp)
-        land = unary_union(list(reader.geometries()))
-        land_prep = prep(land)
+    """Build a 2D land mask for the data grid using Natural Earth coastline.
 
+    The mask is cached in land_mask_cache.npz in data_dir and reused while the grid is unchanged.
+    """
+    try:
         # Read grid coordinates from first available U file
         u_files = sorted([f for f in os.listdir(data_dir) if f.startswith('U_') and f.endswith('.nc')])
         if not u_files:
             print("⚠️  No U files found, cannot build land mask")
             return None
 
-        ds = xr.open_dataset(os.path.join(data_dir, u_files[0]))
-        if 'nav_lat' in ds.data_vars or 'nav_lat' in ds.coords:
+        with xr.open_dataset(os.path.join(data_dir, u_files[0])) as ds:
+            if 'nav_lat' not in ds.data_vars and 'nav_lat' not in ds.coords:
+                print("⚠️  No nav_lat/nav_lon in data, cannot build land mask")
+                return None
             nav_lat = ds['nav_lat'].values
             nav_lon = ds['nav_lon'].values
-        else:
-            print("⚠️  No nav_lat/nav_lon in data, cannot build land mask")
-            ds.close()
-            return None
-        ds.close()
 
         ny, nx = nav_lat.shape
-        mask = np.zeros((ny, nx), dtype=bool)
-        for i in range(ny):
-            for j in range(nx):
-                mask[i, j] = land_prep.contains(Point(float(nav_lon[i, j]), float(nav_lat[i, j])))
+        cache_file = os.path.join(data_dir, 'land_mask_cache.npz')
+        mask = None
+        if os.path.exists(cache_file):
+            try:
+                with np.load(cache_file) as cached:
+                    if (np.array_equal(cached['nav_lat'], nav_lat) and
+                            np.array_equal(cached['nav_lon'], nav_lon)):
+                        mask = cached['mask']
+                        print(f"🗺️  Land mask loaded from cache: {cache_file}")
+            except Exception as e:
+                # A truncated or corrupt cache must not disable land masking: rebuild it instead
+                print(f"⚠️  Ignoring unreadable land mask cache {cache_file}: {e}")
+                mask = None
+
+        if mask is None:
+            import shapely
+            import cartopy.io.shapereader as shpreader
+            from shapely.ops import unary_union
+
+            # Load Natural Earth 50m coastline
+            land_shp = shpreader.natural_earth(resolution='50m', category='physical', name='land')
+            reader = shpreader.Reader(land_shp)
+            land = unary_union(list(reader.geometries()))
+            shapely.prepare(land)
+
+            # Test all grid points against the land polygons in a single vectorized call
+            mask = shapely.contains_xy(land, nav_lon.astype(float), nav_lat.astype(float))
+
+            # Write to a temporary file and move it into place, so an interrupted
+            # write never leaves a partial cache behind
+            tmp_file = cache_file + '.tmp'
+            try:
+                with open(tmp_file, 'wb') as f:
+                    np.savez(f, mask=mask, nav_lat=nav_lat, nav_lon=nav_lon)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                print(f"⚠️  Could not cache land mask: {e}")
 
         # Store grid bounds for index lookup
         lat_min_grid = float(nav_lat.min())
@@ -147,103 +190,51 @@ def load_mobile_bay_settings(data_dir):
 def zarr_to_geojson(zarr_file):
     """Convert zarr trajectory file to GeoJSON format."""
     try:
-        # Open zarr file
-        ds = xr.open_zarr(zarr_file)
+        # Open zarr file (metadata consolidated after the run); every variable
+        # is read in full below, so skip building a dask graph over the chunks
+        ds = xr.open_zarr(zarr_file, chunks=None, consolidated=True)
 
         # Extract trajectory data
         lons = ds.lon.values
         lats = ds.lat.values
         depths = ds.z.values if 'z' in ds else None
-        times = ds.time.values if 'time' in ds else None
 
-        # Handle different data shapes
-        features = []
-
-        if len(lons.shape) == 2:
-            # Multiple particles: shape (particles, time) or (time, particles)
-            if lons.shape[0] < lons.shape[1]:
-                # Likely (particles, time)
-                n_particles = lons.shape[0]
-                for p in range(n_particles):
-                    p_lons = lons[p, :]
-                    p_lats = lats[p, :]
-
-                    # Remove NaN values
-                    valid = ~np.isnan(p_lons) & ~np.isnan(p_lats)
-                    if np.any(valid):
-                        if depths is not None:
-                            p_depths = depths[p, :]
-                            coordinates = [[float(lon), float(lat), float(dep)]
-                                         for lon, lat, dep in zip(p_lons[valid], p_lats[valid], p_depths[valid])]
-                        else:
-                            coordinates = [[float(lon), float(lat)]
-                                         for lon, lat in zip(p_lons[valid], p_lats[valid])]
-
-                        feature = {
-                            "type": "Feature",
-                            "properties": {
-                                "particle_id": int(p),
-                                "trajectory_length": len(coordinates)
-                            },
-                            "geometry": {
-                                "type": "LineString",
-                                "coordinates": coordinates
-                            }
-                        }
-                        features.append(feature)
-            else:
-                # Likely (time, particles)
-                n_particles = lons.shape[1]
-                for p in range(n_particles):
-                    p_lons = lons[:, p]
-                    p_lats = lats[:, p]
-
-                    # Remove NaN values
-                    valid = ~np.isnan(p_lons) & ~np.isnan(p_lats)
-                    if np.any(valid):
-                        if depths is not None:
-                            p_depths = depths[:, p]
-                            coordinates = [[float(lon), float(lat), float(dep)]
-                                         for lon, lat, dep in zip(p_lons[valid], p_lats[valid], p_depths[valid])]
-                        else:
-                            coordinates = [[float(lon), float(lat)]
-                                         for lon, lat in zip(p_lons[valid], p_lats[valid])]
-
-                        feature = {
-                            "type": "Feature",
-                            "properties": {
-                                "particle_id": int(p),
-                                "trajectory_length": len(coordinates)
-                            },
-                            "geometry": {
-                                "type": "LineString",
-                                "coordinates": coordinates
-                            }
-                        }
-                        features.append(feature)
-        else:
+        # Bring every layout to (particles, time) so a single loop handles it
+        if lons.ndim == 1:
             # Single particle: 1D array
-            valid = ~np.isnan(lons) & ~np.isnan(lats)
-            if np.any(valid):
-                if depths is not None:
-                    coordinates = [[float(lon), float(lat), float(dep)]
-                                 for lon, lat, dep in zip(lons[valid], lats[valid], depths[valid])]
-                else:
-                    coordinates = [[float(lon), float(lat)]
-                                 for lon, lat in zip(lons[valid], lats[valid])]
-
-                feature = {
-                    "type": "Feature",
-                    "properties": {
-                        "particle_id": 0,
-                        "trajectory_length": len(coordinates)
-                    },
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": coordinates
-                    }
+            lons, lats = lons[np.newaxis, :], lats[np.newaxis, :]
+            if depths is not None:
+                depths = depths[np.newaxis, :]
+        elif lons.shape[0] >= lons.shape[1]:
+            # Likely (time, particles)
+            lons, lats = lons.T, lats.T
+            if depths is not None:
+                depths = depths.T
+
+        # NaN positions (before release / after deletion) for all particles at once
+        valid_mask = ~(np.isnan(lons) | np.isnan(lats))
+        has_points = valid_mask.any(axis=1)
+
+        # (particles, time, 2 or 3) array of [lon, lat(, depth)] positions, built once
+        columns = [lons, lats] if depths is None else [lons, lats, depths]
+        positions = np.stack(columns, axis=-1).astype(float)
+
+        features = []
+        for p in np.flatnonzero(has_points):
+            coordinates = positions[p][valid_mask[p]].tolist()
+
+            feature = {
+                "type": "Feature",
+                "properties": {
+                    "particle_id": int(p),
+                    "trajectory_length": len(coordinates)
+                },
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": coordinates
                 }
-                features.append(feature)
+            }
+            features.append(feature)
 
         # Create GeoJSON
         geojson = {
@@ -284,44 +275,24 @@ def run_trajectory_simulation(release_locations, simulation_hours=72, output_min
         import parcels
         import copy
 
-        # Create a deep copy of settings for this simulation
+        # Create a deep copy of settings for this simulation (ocean directory already resolved)
         settings = copy.deepcopy(SETTINGS)
 
-        # Fix the directory path to be absolute
-        if 'ocean' in settings and 'directory' in settings['ocean']:
-            # Make sure the directory path is correct
-            ocean_dir = settings['ocean']['directory']
-            if not os.path.isabs(ocean_dir):
-                # If it's relative, make it relative to DATA_DIR
-                settings['ocean']['directory'] = os.path.join(DATA_DIR, '')
-
         # Apply use_biofouling flag (must be in settings before create_hydrodynamic_fieldset)
         settings['use_biofouling'] = bool(use_biofouling)
 
         # Add simulation settings
         # Use provided start_date or determine from available data
         if start_date is None:
-            # Auto-detect start date from available data files
-            available_files = [f for f in os.listdir(DATA_DIR) if f.startswith('U_') and f.endswith('.nc')]
-            if available_files:
-                # Extract dates and use the earliest one
-                available_dates = []
-                for f in available_files:
-                    try:
-                        date_part = f.replace('U_', '').replace('.nc', '')
-                        date_obj = datetime.strptime(date_part, '%Y-%m-%d')
-                        # Ensure timezone-naive for PlasticParcels compatibility
-                        date_obj = date_obj.replace(tzinfo=None)
-                        available_dates.append(date_obj)
-                    except:
-                        continue
-                if available_dates:
-                    start_date = min(available_dates)
-                else:
-                    start_date = datetime(2024, 1, 1, 0, 0, 0)  # Fallback
+            # Auto-detect start date from available data files (earliest one)
+            available_dates = list_available_dates(DATA_DIR)
+            if available_dates:
+                start_date = datetime.strptime(available_dates[0], '%Y-%m-%d')
             else:
                 start_date = datetime(2024, 1, 1, 0, 0, 0)  # Fallback
         
+        start_date_str = start_date.strftime('%Y-%m-%d')  # daily forcing file suffix
+
         settings['simulation'] = {
             'startdate': start_date,
             'runtime': timedelta(hours=simulation_hours),
@@ -347,7 +318,7 @@ def run_trajectory_simulation(release_locations, simulation_hours=72, output_min
         stokes_loaded = False
 
         wind_dir = os.path.join(DATA_DIR, 'wind')
-        wind_file = os.path.join(wind_dir, f'Wind_{start_date.strftime("%Y-%m-%d")}.nc')
+        wind_file = os.path.join(wind_dir, f'Wind_{start_date_str}.nc')
         print(f"Looking for wind file: {wind_file}")
 
         if os.path.exists(wind_file):
@@ -379,7 +350,7 @@ def run_trajectory_simulation(release_locations, simulation_hours=72, output_min
 
         # Stokes is enabled when use_stokes=True AND a matching waves file exists.
         waves_dir = os.path.join(DATA_DIR, 'waves')
-        waves_file = os.path.join(waves_dir, f'Waves_{start_date.strftime("%Y-%m-%d")}.nc')
+        waves_file = os.path.join(waves_dir, f'Waves_{start_date_str}.nc')
         if use_stokes:
             print(f"Looking for waves file: {waves_file}")
         else:
@@ -415,7 +386,7 @@ def run_trajectory_simulation(release_locations, simulation_hours=72, output_min
         # ── BGC fields for biofouling ──────────────────────────────────────────
         if use_biofouling:
             bgc_dir = os.path.join(DATA_DIR, 'bgc')
-            bgc_file = os.path.join(bgc_dir, f'BGC_{start_date.strftime("%Y-%m-%d")}.nc')
+            bgc_file = os.path.join(bgc_dir, f'BGC_{start_date_str}.nc')
 
             # Fallback: find the closest available BGC file
             if not os.path.exists(bgc_file) and os.path.isdir(bgc_dir):
@@ -424,7 +395,7 @@ def run_trajectory_simulation(release_locations, simulation_hours=72, output_min
                 ])
                 if available_bgc:
                     bgc_file = os.path.join(bgc_dir, available_bgc[-1])
-                    print(f"BGC file for {start_date.date()} not found; using {available_bgc[-1]}")
+                    print(f"BGC file for {start_date_str} not found; using {available_bgc[-1]}")
 
             if os.path.exists(bgc_file):
                 # ── Pre-validate BGC file to avoid segfault in C netCDF/HDF5 layer ──
@@ -550,6 +521,11 @@ def run_trajectory_simulation(release_locations, simulation_hours=72, output_min
             output_file=pset.ParticleFile(name=output_file, outputdt=settings['simulation']['outputdt'])
         )
 
+        # Parcels appends to the store array by array; collapse the metadata
+        # into a single .zmetadata so the reader needs one metadata read
+        import zarr
+        zarr.consolidate_metadata(output_file)
+
         # Explicit memory cleanup: free large C-extension objects before returning
         del pset
         del fieldset
@@ -756,9 +732,7 @@ def _get_vector_cache(date_str, u_file, v_file):
         return VECTOR_CACHE[date_str]
 
     print(f"[vector-cache] Loading {date_str} into memory cache...")
-    u_ds = xr.open_dataset(u_file)
-    v_ds = xr.open_dataset(v_file)
-    try:
+    with xr.open_dataset(u_file) as u_ds, xr.open_dataset(v_file) as v_ds:
         u_var = next((v for v in ['vozocrtx', 'u', 'eastward_velocity', 'u_velocity']
                       if v in u_ds.data_vars), None)
         v_var = next((v for v in ['vomecrty', 'v', 'northward_velocity', 'v_velocity']
@@ -799,15 +773,19 @@ def _get_vector_cache(date_str, u_file, v_file):
             lons = u_full.longitude.values
 
         if lats.ndim == 1:
-            lons, lats = np.meshgrid(lons, lats)
+            lons, lats = np.broadcast_arrays(lons[np.newaxis, :], lats[:, np.newaxis])
 
         # ── load full arrays into RAM (small: ~14 MB per var per date) ─────
-        u_arr = u_full.values  # (time, depth, y, x)
-        v_arr = v_full.values
+        # float32 is plenty for display and halves the cache footprint
+        u_arr = u_full.values.astype(np.float32, copy=False)  # (time, depth, y, x)
+        v_arr = v_full.values.astype(np.float32, copy=False)
+
+        # Land flags for every grid point, so requests only have to subsample them
+        land = land_mask_lookup(lats, lons) if LAND_MASK is not None else None
 
         entry = {
             'u': u_arr, 'v': v_arr,
-            'lats': lats, 'lons': lons,
+            'lats': lats, 'lons': lons, 'land': land,
             'times': times, 'depth_values': depth_values,
             'time_dim': time_dim, 'depth_dim': depth_dim,
             'files': [u_file, v_file],
@@ -815,9 +793,38 @@ def _get_vector_cache(date_str, u_file, v_file):
         VECTOR_CACHE[date_str] = entry
         print(f"[vector-cache] {date_str} cached: u={u_arr.shape}, {u_arr.nbytes/1e6:.1f} MB")
         return entry
-    finally:
-        u_ds.close()
-        v_ds.close()
+
+def land_mask_lookup(lats, lons):
+    """Return a boolean array that is True where the points fall on LAND_MASK land cells."""
+    lm = LAND_MASK
+    gi = np.rint((lats - lm['lat_min']) / (lm['lat_max'] - lm['lat_min']) * (lm['ny'] - 1))
+    gj = np.rint((lons - lm['lon_min']) / (lm['lon_max'] - lm['lon_min']) * (lm['nx'] - 1))
+    gi = np.clip(gi, 0, lm['ny'] - 1).astype(int)
+    gj = np.clip(gj, 0, lm['nx'] - 1).astype(int)
+    return lm['mask'][gi, gj]
+
+
+def build_vectors(lat_sub, lon_sub, u_sub, v_sub, mask_sub, land_sub=None):
+    """Turn subsampled 2D grids into the JSON vector list, skipping NaNs and land points.
+
+    land_sub may hold precomputed land flags for the points; otherwise they are looked up.
+    """
+    keep = mask_sub & ~np.isnan(u_sub) & ~np.isnan(v_sub)
+    if land_sub is None and LAND_MASK is not None:
+        land_sub = land_mask_lookup(lat_sub, lon_sub)
+    if land_sub is not None:
+        keep &= ~land_sub
+
+    lats = lat_sub[keep].astype(float)
+    lons = lon_sub[keep].astype(float)
+    u = u_sub[keep].astype(float)
+    v = v_sub[keep].astype(float)
+    magnitude = np.sqrt(u**2 + v**2)
+
+    return [{"lat": lat, "lng": lon, "u": u_val, "v": v_val, "magnitude": mag}
+            for lat, lon, u_val, v_val, mag in zip(lats.tolist(), lons.tolist(), u.tolist(),
+                                                    v.tolist(), magnitude.tolist())]
+
 
 @app.route('/vector-field', methods=['GET'])
 def get_vector_field():
@@ -851,48 +858,35 @@ def get_vector_field():
         
         if not os.path.exists(u_file) or not os.path.exists(v_file):
             # Find all available dates and cycle through them based on simulation time
-            available_files = [f for f in os.listdir(DATA_DIR) if f.startswith('U_') and f.endswith('.nc')]
-            if available_files:
-                # Extract dates from available files and sort them
-                available_dates = []
-                for f in available_files:
-                    try:
-                        date_part = f.replace('U_', '').replace('.nc', '')
-                        available_dates.append(date_part)
-                    except:
-                        continue
-                
-                available_dates.sort()
+            available_dates = list_available_dates(DATA_DIR)
+            if available_dates:
                 print(f"Available data dates: {available_dates}")
-                
-                if available_dates:
-                    # Always start from 2024-01-01 and calculate simulation hours from that fixed start
-                    try:
-                        # Fixed simulation start time - always 2024-01-01T00:00:00Z
-                        simulation_start = datetime(2024, 1, 1, 0, 0, 0)
-                        
-                        # Calculate hours elapsed since simulation start (ignore real-world date)
-                        if dt.year == 2024 and dt.month == 1:  # If timestamp is already in simulation timeframe
-                            time_diff = dt - simulation_start
-                            simulation_hour = int(time_diff.total_seconds() // 3600)
-                        else:
-                            # For any other timestamp, extract just the hour and use it as simulation hour
-                            simulation_hour = dt.hour
-                        
-                        day_index = (simulation_hour // 24) % len(available_dates)  # Cycle through days
-                        selected_date = available_dates[day_index]
-                        print(f"Fixed simulation start: 2024-01-01, simulation hour: {simulation_hour}, selected day index: {day_index}, using date: {selected_date}")
-                    except Exception as e:
-                        print(f"Error in simulation time calculation: {e}")
-                        # Fallback to first available date
-                        selected_date = available_dates[0]
-                        print(f"Using fallback date: {selected_date}")
+
+                # Always start from 2024-01-01 and calculate simulation hours from that fixed start
+                try:
+                    # Fixed simulation start time - always 2024-01-01T00:00:00Z
+                    simulation_start = datetime(2024, 1, 1, 0, 0, 0)
                     
-                    u_file = os.path.join(DATA_DIR, f'U_{selected_date}.nc')
-                    v_file = os.path.join(DATA_DIR, f'V_{selected_date}.nc')
-                    print(f"Using files: {u_file}, {v_file}")
-                else:
-                    return jsonify({"error": f"No valid ocean current data files found"}), 404
+                    # Calculate hours elapsed since simulation start (ignore real-world date)
+                    if dt.year == 2024 and dt.month == 1:  # If timestamp is already in simulation timeframe
+                        time_diff = dt - simulation_start
+                        simulation_hour = int(time_diff.total_seconds() // 3600)
+                    else:
+                        # For any other timestamp, extract just the hour and use it as simulation hour
+                        simulation_hour = dt.hour
+                    
+                    day_index = (simulation_hour // 24) % len(available_dates)  # Cycle through days
+                    selected_date = available_dates[day_index]
+                    print(f"Fixed simulation start: 2024-01-01, simulation hour: {simulation_hour}, selected day index: {day_index}, using date: {selected_date}")
+                except Exception as e:
+                    print(f"Error in simulation time calculation: {e}")
+                    # Fallback to first available date
+                    selected_date = available_dates[0]
+                    print(f"Using fallback date: {selected_date}")
+                
+                u_file = os.path.join(DATA_DIR, f'U_{selected_date}.nc')
+                v_file = os.path.join(DATA_DIR, f'V_{selected_date}.nc')
+                print(f"Using files: {u_file}, {v_file}")
             else:
                 return jsonify({"error": f"No ocean current data available for {date_str}"}), 404
                 
@@ -904,6 +898,7 @@ def get_vector_field():
         v_arr        = entry['v']
         lat_grid     = entry['lats']        # 2D (y, x)
         lon_grid     = entry['lons']        # 2D (y, x)
+        land_grid    = entry['land']        # 2D (y, x) land flags, or None
         times        = entry['times']       # pd.DatetimeIndex, UTC-aware
         depth_values = entry['depth_values']
         time_dim     = entry['time_dim']
@@ -941,11 +936,6 @@ def get_vector_field():
         print(f"u_2d shape after time/depth selection: {u_2d.shape}")
 
         # --- Bounding box + subsampling ---------------------------------------
-        # Filter data to bounding box
-        lat_mask = (lat_grid >= lat_min) & (lat_grid <= lat_max)
-        lon_mask = (lon_grid >= lon_min) & (lon_grid <= lon_max)
-        mask = lat_mask & lon_mask
-
         # Subsample based on grid density with aspect ratio correction
         if lat_grid.ndim == 2:
             lat_range = lat_max - lat_min
@@ -963,9 +953,13 @@ def get_vector_field():
 
             lat_sub  = lat_grid[::step_lat, ::step_lon]
             lon_sub  = lon_grid[::step_lat, ::step_lon]
-            mask_sub = mask[::step_lat, ::step_lon]
             u_sub    = u_2d[::step_lat, ::step_lon]
             v_sub    = v_2d[::step_lat, ::step_lon]
+            land_sub = land_grid[::step_lat, ::step_lon] if land_grid is not None else None
+
+            # Filter to bounding box (only the subsampled points are ever used)
+            mask_sub = ((lat_sub >= lat_min) & (lat_sub <= lat_max) &
+                        (lon_sub >= lon_min) & (lon_sub <= lon_max))
         else:
             lats = lat_grid.ravel()
             lons = lon_grid.ravel()
@@ -984,39 +978,15 @@ def get_vector_field():
             u_sub = u_2d[np.ix_(lat_sub_idx, lon_sub_idx)]
             v_sub = v_2d[np.ix_(lat_sub_idx, lon_sub_idx)]
 
-            lon_grid_sub, lat_grid_sub = np.meshgrid(lon_sub, lat_sub)
+            lon_grid_sub, lat_grid_sub = np.broadcast_arrays(lon_sub[np.newaxis, :], lat_sub[:, np.newaxis])
             lat_sub  = lat_grid_sub
             lon_sub  = lon_grid_sub
             mask_sub = np.ones_like(lat_sub, dtype=bool)
+            land_sub = None
             
         # Create vector field data (skip land points using precomputed land mask)
-        vectors = []
-        for i in range(lat_sub.shape[0]):
-            for j in range(lat_sub.shape[1]):
-                if mask_sub[i, j] and not (np.isnan(u_sub[i, j]) or np.isnan(v_sub[i, j])):
-                    # Skip land points if land mask is available
-                    if LAND_MASK is not None:
-                        lm = LAND_MASK
-                        lat_val = float(lat_sub[i, j])
-                        lon_val = float(lon_sub[i, j])
-                        gi = int(round((lat_val - lm['lat_min']) / (lm['lat_max'] - lm['lat_min']) * (lm['ny'] - 1)))
-                        gj = int(round((lon_val - lm['lon_min']) / (lm['lon_max'] - lm['lon_min']) * (lm['nx'] - 1)))
-                        gi = max(0, min(gi, lm['ny'] - 1))
-                        gj = max(0, min(gj, lm['nx'] - 1))
-                        if lm['mask'][gi, gj]:
-                            continue
-                    u_val = float(u_sub[i, j])
-                    v_val = float(v_sub[i, j])
-                    magnitude = float(np.sqrt(u_val**2 + v_val**2))
-                    
-                    vectors.append({
-                        "lat": float(lat_sub[i, j]),
-                        "lng": float(lon_sub[i, j]),
-                        "u": u_val,
-                        "v": v_val,
-                        "magnitude": magnitude
-                    })
-                    
+        vectors = build_vectors(lat_sub, lon_sub, u_sub, v_sub, mask_sub, land_sub)
+
         response_data = {
             "timestamp": timestamp,
             "vectors": vectors,
@@ -1090,32 +1060,24 @@ def get_wind_field():
                 return jsonify({"error": f"No wind data available. Wind dir: {wind_dir}"}), 404
         
         # Load wind NetCDF
-        ds = xr.open_dataset(wind_file)
-        
-        # Find closest time step
-        time_index = 0
-        try:
-            requested_time = pd.to_datetime(timestamp, utc=True)
-            time_coords = pd.to_datetime(ds.time.values, utc=True)
-            time_diffs = np.abs(time_coords - requested_time)
-            time_index = int(np.argmin(time_diffs))
-        except Exception as e:
-            print(f"Wind time parsing fallback: {e}")
-        
-        u10 = ds['u10'].isel(time=time_index).values  # shape: (lat, lon)
-        v10 = ds['v10'].isel(time=time_index).values
-        lats = ds['latitude'].values
-        lons = ds['longitude'].values
-        
-        ds.close()
-        
-        # Create meshgrid
-        lon_grid, lat_grid = np.meshgrid(lons, lats)
+        with xr.open_dataset(wind_file) as ds:
+            # Find closest time step
+            time_index = 0
+            try:
+                requested_time = pd.to_datetime(timestamp, utc=True)
+                time_coords = pd.to_datetime(ds.time.values, utc=True)
+                time_diffs = np.abs(time_coords - requested_time)
+                time_index = int(np.argmin(time_diffs))
+            except Exception as e:
+                print(f"Wind time parsing fallback: {e}")
+            
+            u10 = ds['u10'].isel(time=time_index).values  # shape: (lat, lon)
+            v10 = ds['v10'].isel(time=time_index).values
+            lats = ds['latitude'].values
+            lons = ds['longitude'].values
         
-        # Filter to bounding box
-        lat_mask = (lat_grid >= lat_min) & (lat_grid <= lat_max)
-        lon_mask = (lon_grid >= lon_min) & (lon_grid <= lon_max)
-        bbox_mask = lat_mask & lon_mask
+        # 2D (lat, lon) views of the 1D coordinates (no meshgrid copies)
+        lon_grid, lat_grid = np.broadcast_arrays(lons[np.newaxis, :], lats[:, np.newaxis])
         
         # Subsample based on grid density
         lat_range = lat_max - lat_min
@@ -1130,39 +1092,16 @@ def get_wind_field():
         
         lat_sub = lat_grid[::step_lat, ::step_lon]
         lon_sub = lon_grid[::step_lat, ::step_lon]
-        mask_sub = bbox_mask[::step_lat, ::step_lon]
         u_sub = u10[::step_lat, ::step_lon]
         v_sub = v10[::step_lat, ::step_lon]
         
-        # Build vectors list (skip land using precomputed mask)
-        vectors = []
-        for i in range(lat_sub.shape[0]):
-            for j in range(lat_sub.shape[1]):
-                if mask_sub[i, j] and not (np.isnan(u_sub[i, j]) or np.isnan(v_sub[i, j])):
-                    # Skip land points if land mask is available
-                    if LAND_MASK is not None:
-                        lm = LAND_MASK
-                        lat_val = float(lat_sub[i, j])
-                        lon_val = float(lon_sub[i, j])
-                        gi = int(round((lat_val - lm['lat_min']) / (lm['lat_max'] - lm['lat_min']) * (lm['ny'] - 1)))
-                        gj = int(round((lon_val - lm['lon_min']) / (lm['lon_max'] - lm['lon_min']) * (lm['nx'] - 1)))
-                        gi = max(0, min(gi, lm['ny'] - 1))
-                        gj = max(0, min(gj, lm['nx'] - 1))
-                        if lm['mask'][gi, gj]:
-                            continue
-                    
-                    u_val = float(u_sub[i, j])
-                    v_val = float(v_sub[i, j])
-                    magnitude = float(np.sqrt(u_val**2 + v_val**2))
-                    
-                    vectors.append({
-                        "lat": float(lat_sub[i, j]),
-                        "lng": float(lon_sub[i, j]),
-                        "u": u_val,
-                        "v": v_val,
-                        "magnitude": magnitude
-                    })
+        # Filter to bounding box on the subsampled points only
+        mask_sub = ((lat_sub >= lat_min) & (lat_sub <= lat_max) &
+                    (lon_sub >= lon_min) & (lon_sub <= lon_max))
         
+        # Build vectors list (skip land using precomputed mask)
+        vectors = build_vectors(lat_sub, lon_sub, u_sub, v_sub, mask_sub)
+
         print(f"Wind field: {len(vectors)} vectors for {date_str}, time_index={time_index}")
         
         return jsonify({
@@ -1184,48 +1123,51 @@ def get_wind_field():
 @app.route('/info', methods=['GET'])
 def get_info():
     """Get information about the loaded dataset."""
+    global INFO_CACHE
     try:
         if SETTINGS is None:
             return jsonify({"error": "No settings loaded"}), 500
 
-        # Import PlasticParcels to get fieldset info
-        from plasticparcels.constructors import create_hydrodynamic_fieldset
-        import copy
-
-        # Create temporary settings for fieldset creation
-        temp_settings = copy.deepcopy(SETTINGS)
-
-        # Fix the directory path to be absolute
-        if 'ocean' in temp_settings and 'directory' in temp_settings['ocean']:
-            ocean_dir = temp_settings['ocean']['directory']
-            if not os.path.isabs(ocean_dir):
-                temp_settings['ocean']['directory'] = os.path.join(DATA_DIR, '')
-
-        temp_settings['simulation'] = {
-            'startdate': datetime(2024, 1, 1, 0, 0, 0),
-            'runtime': timedelta(hours=1),
-            'outputdt': timedelta(hours=1),
-            'dt': timedelta(minutes=30),
-        }
-
-        fieldset = create_hydrodynamic_fieldset(temp_settings)
-
-        info = {
-            "domain": {
-                "lon_min": float(fieldset.U.grid.lon.min()),
-                "lon_max": float(fieldset.U.grid.lon.max()),
-                "lat_min": float(fieldset.U.grid.lat.min()),
-                "lat_max": float(fieldset.U.grid.lat.max())
-            },
-            "grid_shape": list(fieldset.U.grid.lat.shape),
-            "time_steps": len(fieldset.U.grid.time),
-            "time_range": {
-                "start": float(fieldset.U.grid.time[0]),
-                "end": float(fieldset.U.grid.time[-1])
-            },
-            "data_directory": DATA_DIR,
-            "capabilities": get_simulation_capabilities()
-        }
+        # The grid description only depends on the loaded dataset, so build the
+        # fieldset once and reuse it for every later /info request
+        if INFO_CACHE is None:
+            # Import PlasticParcels to get fieldset info
+            from plasticparcels.constructors import create_hydrodynamic_fieldset
+            import copy
+
+            # Create temporary settings for fieldset creation
+            temp_settings = copy.deepcopy(SETTINGS)
+
+            temp_settings['simulation'] = {
+                'startdate': datetime(2024, 1, 1, 0, 0, 0),
+                'runtime': timedelta(hours=1),
+                'outputdt': timedelta(hours=1),
+                'dt': timedelta(minutes=30),
+            }
+
+            fieldset = create_hydrodynamic_fieldset(temp_settings)
+
+            INFO_CACHE = {
+                "domain": {
+                    "lon_min": float(fieldset.U.grid.lon.min()),
+                    "lon_max": float(fieldset.U.grid.lon.max()),
+                    "lat_min": float(fieldset.U.grid.lat.min()),
+                    "lat_max": float(fieldset.U.grid.lat.max())
+                },
+                "grid_shape": list(fieldset.U.grid.lat.shape),
+                "time_steps": len(fieldset.U.grid.time),
+                "time_range": {
+                    "start": float(fieldset.U.grid.time[0]),
+                    "end": float(fieldset.U.grid.time[-1])
+                },
+            }
+            del fieldset
+            gc.collect()
+
+        # Capabilities depend on which optional files are present, so stay live
+        info = dict(INFO_CACHE)
+        info["data_directory"] = DATA_DIR
+        info["capabilities"] = get_simulation_capabilities()
 
         return jsonify(info)
 
@@ -1239,27 +1181,12 @@ def get_data_range():
         if not DATA_DIR:
             return jsonify({"error": "Server not initialized"}), 500
 
-        # Find all available U files (velocity data)
-        available_files = [f for f in os.listdir(DATA_DIR) if f.startswith('U_') and f.endswith('.nc')]
-
-        if not available_files:
-            return jsonify({"error": "No data files found"}), 404
-
-        # Extract dates from filenames
-        available_dates = []
-        for f in available_files:
-            try:
-                date_part = f.replace('U_', '').replace('.nc', '')
-                # Validate date format
-                datetime.strptime(date_part, '%Y-%m-%d')
-                available_dates.append(date_part)
-            except ValueError:
-                continue
+        # Find all available U files (velocity data) and their dates
+        available_dates = list_available_dates(DATA_DIR)
 
         if not available_dates:
             return jsonify({"error": "No valid date files found"}), 404
 
-        available_dates.sort()
         start_date = available_dates[0]
         end_date = available_dates[-1]
 
@@ -1276,7 +1203,7 @@ def get_data_range():
 
 def initialize_server(data_dir):
     """Initialize the server with Mobile Bay data."""
-    global DATA_DIR, SETTINGS, LAND_MASK
+    global DATA_DIR, SETTINGS, LAND_MASK, INFO_CACHE
 
     if not os.path.exists(data_dir):
         raise FileNotFoundError(f"Data directory not found: {data_dir}")
@@ -1285,8 +1212,15 @@ def initialize_server(data_dir):
     SETTINGS = load_mobile_bay_settings(data_dir)
     DATA_DIR = data_dir
 
+    # Resolve a relative ocean directory once, rather than in every request
+    if 'ocean' in SETTINGS and 'directory' in SETTINGS['ocean']:
+        if not os.path.isabs(SETTINGS['ocean']['directory']):
+            SETTINGS['ocean']['directory'] = os.path.join(DATA_DIR, '')
+    INFO_CACHE = None
+
     # Build land mask for vector field filtering
     LAND_MASK = build_land_mask(data_dir)
+    VECTOR_CACHE.clear()  # cached entries hold land flags derived from LAND_MASK
 
     print(f"✅ Server initialized with data from: {data_dir}")
 